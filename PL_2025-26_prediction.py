@@ -48,7 +48,9 @@ Usage
 Run the script from a terminal with Python 3.  Ensure that
 `pandas`, `numpy` and `scikit‑learn` are installed.  All required
 CSV files should reside in the same directory as this script or an
-alternate path may be provided via the `season_files` list.
+alternate path may be provided via the `season_files` list.  Season
+summaries and the trained model are cached in a `.cache` directory next
+to the script and rebuilt automatically whenever a CSV file is modified.
 
 Example:
 
@@ -60,25 +62,38 @@ The script outputs a predicted ranking of the 20 clubs for the
 2025/26 Premier League season.
 """
 
+import functools
+import hashlib
 import os
-from collections import defaultdict
-from typing import Dict, List, Tuple
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
 
+import joblib
 import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
 
+# directory used to cache intermediate results between runs
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# bump whenever the layout of a season summary changes so that stale
+# cached summaries are ignored
+SUMMARY_CACHE_VERSION = 6
+# season statistics used as model features, in column order
+FEATURE_COLS = ["points", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff"]
+# per-team record built by summarise_season; season totals comfortably
+# fit in 16 bits and league positions in 8
+SUMMARY_DTYPE = np.dtype([(name, np.int16) for name in FEATURE_COLS] + [("position", np.int8)])
 
 def parse_match_results(df: pd.DataFrame) -> pd.DataFrame:
     """Parse final score into integer goal columns.
 
     The raw CSV files use a `FT` column that stores the full‑time
     result as a string such as `"2-1"`.  This helper splits the
-    column into separate home and away goal counts and returns an
-    updated DataFrame with `home_goals` and `away_goals` columns.
+    column into separate home and away goal counts and returns a new
+    DataFrame holding only the columns needed to summarise a season.
 
     Parameters
     ----------
@@ -88,13 +103,66 @@ def parse_match_results(df: pd.DataFrame) -> pd.DataFrame:
     Returns
     -------
     DataFrame
-        DataFrame with added `home_goals` and `away_goals` columns.
+        DataFrame with columns `Team 1`, `Team 2`, `home_goals` and
+        `away_goals`.
+
+    Raises
+    ------
+    ValueError
+        If a score is missing or is not of the form `"home-away"`.
     """
-    goals = df["FT"].str.split("-", expand=True)
-    df = df.copy()
-    df["home_goals"] = goals[0].astype(int)
-    df["away_goals"] = goals[1].astype(int)
-    return df 
+    ft = df["FT"]
+    scores = np.char.strip(ft.fillna("").to_numpy(dtype=str))
+    length = np.char.str_len(scores)
+    dash = np.char.find(scores, "-")
+
+    # view the scores as a fixed-width grid of characters so both goal
+    # counts can be read off in one pass without building an
+    # intermediate object DataFrame
+    digits = scores.astype("U5").view("U1").reshape(len(scores), 5).view(np.int32) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+    rows = np.arange(len(scores))
+    two_digit_home = dash == 2
+    two_digit_away = length - dash == 3
+    a0_col = np.clip(dash + 1, 0, 4)
+    a1_col = np.clip(dash + 2, 0, 4)
+    home = np.where(two_digit_home, 10 * digits[:, 0] + digits[:, 1], digits[:, 0])
+    a0 = digits[rows, a0_col]
+    a1 = digits[rows, a1_col]
+    away = np.where(two_digit_away, 10 * a0 + a1, a0)
+
+    # only trust the grid for well-formed "h-a" scores of one or two
+    # digits a side; anything else is split row by row and rejected if
+    # it still is not a pair of goal counts
+    valid = (
+        ft.notna().to_numpy()
+        & (length <= 5)
+        & ((dash == 1) | (dash == 2))
+        & ((length - dash == 2) | (length - dash == 3))
+        & is_digit[:, 0]
+        & (is_digit[:, 1] | ~two_digit_home)
+        & is_digit[rows, a0_col]
+        & (is_digit[rows, a1_col] | ~two_digit_away)
+    )
+    bad_rows = []
+    for i in np.flatnonzero(~valid):
+        try:
+            h, a = (int(part) for part in str(ft.iloc[i]).split("-"))
+        except ValueError:
+            h = a = -1
+        if not (0 <= h <= 127 and 0 <= a <= 127):
+            bad_rows.append(f"{df.index[i]!r} ({ft.iloc[i]!r})")
+            continue
+        home[i], away[i] = h, a
+    if bad_rows:
+        raise ValueError("Cannot parse FT score in rows " + ", ".join(bad_rows))
+
+    return pd.DataFrame({
+        "Team 1": df["Team 1"].array,
+        "Team 2": df["Team 2"].array,
+        "home_goals": home.astype(np.int8),
+        "away_goals": away.astype(np.int8),
+    })
 
 def summarise_season(matches: pd.DataFrame) -> pd.DataFrame:
     """Summarise a season into per‑team statistics and final ranking.
@@ -104,79 +172,146 @@ def summarise_season(matches: pd.DataFrame) -> pd.DataFrame:
     draws, losses, goals for and against and goal difference for each
     team.  After accumulating statistics, the teams are sorted by
     points (descending), goal difference (descending) and goals for
-    (descending) to determine the final ranking.
+    (descending) to determine the final ranking.  If both team columns
+    share a categorical dtype its codes are used as team ids; categories
+    without any match in the season are left out of the summary.
     
     Parameters
     ----------
     matches : DataFrame
         DataFrame of parsed match results.
 
+    Raises
+    ------
+    ValueError
+        If a team name is missing.
+
     Returns
 
     -------
     DataFrame
-        Summary of the season with one row per team and columns:
-        [`team`, `points`, `wins`, `draws`, `losses`, `goals_for`,
-        `goals_against`, `goal_diff`, `position`].
+        Summary of the season indexed by `team` with one row per team
+        and columns: [`points`, `wins`, `draws`, `losses`,
+        `goals_for`, `goals_against`, `goal_diff`, `position`].
     """
-    teams: Dict[str, Dict[str, int]] = defaultdict(lambda: {
-        "points": 0,
-        "wins": 0,
-        "draws": 0,
-        "losses": 0,
-        "goals_for": 0,
-        "goals_against": 0,
-    })
+    hg = matches["home_goals"].to_numpy()
+    ag = matches["away_goals"].to_numpy()
+
+    # map team names to dense integer ids shared by home and away sides;
+    # a shared categorical vocabulary already provides them as codes
+    home_teams, away_teams = matches["Team 1"], matches["Team 2"]
+    if isinstance(home_teams.dtype, pd.CategoricalDtype) and home_teams.dtype == away_teams.dtype:
+        teams = home_teams.cat.categories
+        home = home_teams.cat.codes.to_numpy()
+        away = away_teams.cat.codes.to_numpy()
+    else:
+        # interleave home and away so ids follow first appearance in
+        # match order, which decides the order of fully level teams
+        codes, teams = pd.factorize(
+            np.column_stack([home_teams.to_numpy(), away_teams.to_numpy()]).ravel()
+        )
+        home, away = codes[0::2], codes[1::2]
+    missing = (home < 0) | (away < 0)
+    if missing.any():
+        raise ValueError(
+            f"Missing team name in rows {list(matches.index[missing])}"
+        )
+    n_teams = len(teams)
+
+    # one record per team holding all of its statistics
+    stats = np.zeros(n_teams, dtype=SUMMARY_DTYPE)
+
+    def per_team(home_values: np.ndarray, away_values: np.ndarray) -> np.ndarray:
+        # sum per-match values into per-team totals indexed by team id
+        return np.bincount(home, home_values, n_teams) + np.bincount(away, away_values, n_teams)
+
+    home_win, away_win, draw = hg > ag, hg < ag, hg == ag
+    stats["goals_for"] = per_team(hg, ag)
+    stats["goals_against"] = per_team(ag, hg)
+    stats["wins"] = per_team(home_win, away_win)
+    stats["draws"] = per_team(draw, draw)
+    stats["losses"] = per_team(away_win, home_win)
+    stats["points"] = 3 * stats["wins"] + stats["draws"]
+    stats["goal_diff"] = stats["goals_for"] - stats["goals_against"]
+
+    # rank by points, goal diff, goals for (all descending) on the raw
+    # records so the frame only has to be built once, already in order
+    order = np.lexsort((-stats["goals_for"], -stats["goal_diff"], -stats["points"]))
+    # a shared vocabulary may name teams that did not play this season
+    played = stats["wins"] + stats["draws"] + stats["losses"] > 0
+    order = order[played[order]]
+    stats = stats[order]
+    stats["position"] = np.arange(1, len(order) + 1)
+    return pd.DataFrame(stats, index=pd.Index(np.asarray(teams)[order], name="team"))
+
+def _write_atomically(path: str, write: Callable[[str], None]) -> None:
+    """Call `write` on a temporary file and move it into place at `path`.
+
+    The temporary file lives in the same directory so the final
+    `os.replace` is atomic; an interrupted write therefore never leaves
+    a truncated file at `path`.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _cached_summary(path: str) -> pd.DataFrame:
+    """Return the season summary for a CSV file, reusing a cached copy.
+
+    Summaries are memoised in process and pickled under `CACHE_DIR`,
+    both keyed by the file name and its modification time, so editing
+    a season file invalidates its cached summary.  Repeated calls
+    return the same DataFrame, which must not be modified.
+
+    Parameters
+    ----------
+    path : str
+        Path to a season CSV file.
 
-    # iterate through each match and update team statistics
-    for _, row in matches.iterrows():
-        home, away = row["Team 1"], row["Team 2"]
-        hg, ag = row["home_goals"], row["away_goals"]
-        # update goals
-        teams[home]["goals_for"] += hg
-        teams[home]["goals_against"] += ag
-        teams[away]["goals_for"] += ag
-        teams[away]["goals_against"] += hg
-        # determine match outcome
-
-        if hg > ag:
-            # home win
-            teams[home]["points"] += 3
-            teams[home]["wins"] += 1
-            teams[away]["losses"] += 1
-        elif hg < ag:
-            # away win
-            teams[away]["points"] += 3
-            teams[away]["wins"] += 1
-            teams[home]["losses"] += 1
-        else:
-            # draw
-            teams[home]["points"] += 1
-            teams[away]["points"] += 1
-            teams[home]["draws"] += 1
-            teams[away]["draws"] += 1
-    # build DataFrame
-
-    data = []
-    for team, stats in teams.items():
-        goal_diff = stats["goals_for"] - stats["goals_against"]
-        data.append({
-            "team": team,
-            "points": stats["points"],
-            "wins": stats["wins"],
-            "draws": stats["draws"],
-            "losses": stats["losses"],
-            "goals_for": stats["goals_for"],
-            "goals_against": stats["goals_against"],
-            "goal_diff": goal_diff,
-        })
-
-    summary = pd.DataFrame(data)
-    # sort by points, goal diff, goals for
-    summary = summary.sort_values(
-        ["points", "goal_diff", "goals_for"], ascending=[False, False, False]
-    ).reset_index(drop=True)
-    summary["position"] = summary.index + 1
+    Returns
+    -------
+    DataFrame
+        Output of `summarise_season` for the given file.
+    """
+    return _summary_for(path, os.stat(path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=None)
+def _summary_for(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Build or load the summary of `path` as of modification time `mtime_ns`."""
+    # pickled frames are only guaranteed to load under the pandas and
+    # numpy versions that wrote them
+    key = (
+        f"{os.path.basename(path)}.{mtime_ns}.v{SUMMARY_CACHE_VERSION}"
+        f".pd{pd.__version__}.np{np.__version__}.pkl"
+    )
+    cache_path = os.path.join(CACHE_DIR, key)
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_pickle(cache_path)
+        except Exception:
+            # unreadable cache entry – rebuild it from the CSV below
+            pass
+
+    # only the teams and the final score are used downstream, so skip
+    # type inference for the date and half-time columns entirely
+    raw = pd.read_csv(
+        path,
+        usecols=["Team 1", "FT", "Team 2"],
+        dtype={"Team 1": "string", "Team 2": "string", "FT": "string"},
+    )
+    # give both team columns one categorical vocabulary so the season
+    # can be summarised on integer team codes rather than names
+    teams = pd.CategoricalDtype(pd.unique(raw[["Team 1", "Team 2"]].to_numpy().ravel()))
+    raw = raw.astype({"Team 1": teams, "Team 2": teams})
+    summary = summarise_season(parse_match_results(raw))
+    _write_atomically(cache_path, summary.to_pickle)
     return summary
 
 def prepare_training_data(season_files: List[str]) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
@@ -205,54 +340,45 @@ def prepare_training_data(season_files: List[str]) -> Tuple[pd.DataFrame, pd.Ser
         Feature matrix for the most recent season in the list (used
         for prediction).
     """
-    season_summaries: Dict[str, pd.DataFrame] = {}
-  
-    # compute summary stats for each season
-    for file_path in season_files:
-        raw = pd.read_csv(file_path)
-        parsed = parse_match_results(raw)
-        summary = summarise_season(parsed)
-        season_summaries[file_path] = summary
+    # compute summary stats for each season, reading the files
+    # concurrently since pandas releases the GIL while parsing CSVs
+    with ThreadPoolExecutor(max_workers=max(len(season_files), 1)) as executor:
+        summaries = executor.map(_cached_summary, season_files)
+        season_summaries: Dict[str, pd.DataFrame] = dict(zip(season_files, summaries))
 
     # Build training dataset: use season n's stats to predict season n+1's position
-    feature_rows = []
-    target_rows = []
     files_sorted = season_files
+    # preallocate the training matrix and fill it one season at a time
+    n_rows = sum(len(season_summaries[f]) for f in files_sorted[1:])
+    # scikit-learn's trees work in float32 internally, so hand them that
+    X = np.empty((n_rows, len(FEATURE_COLS)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=np.int8)
+    start = 0
     
     for i in range(len(files_sorted) - 1):
-        prev_summary = season_summaries[files_sorted[i]].copy().set_index("team")
-        curr_summary = season_summaries[files_sorted[i + 1]].copy().set_index("team")
-
-        # compute default features based on bottom three teams from previous season
-        bottom_three = prev_summary.sort_values(
-            ["points", "goal_diff", "goals_for"], ascending=[True, True, True]
-        ).head(3)
-        default_features = bottom_three.mean().to_dict()
-        # for each team in current season, collect features
-        for team, row in curr_summary.iterrows():
-            if team in prev_summary.index:
-                feats = prev_summary.loc[team][
-                    ["points", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff"]
-                ].to_dict()
-            else:
-                # promoted team – assign default bottom three stats
-                feats = {k: default_features[k] for k in [
-                    "points", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff"
-                ]}
-            feature_rows.append(feats)
-            target_rows.append(row["position"])
-
-    X_train = pd.DataFrame(feature_rows)
-    y_train = pd.Series(target_rows)
+        prev_summary = season_summaries[files_sorted[i]]
+        curr_summary = season_summaries[files_sorted[i + 1]]
+
+        # compute default features once per season from the bottom three
+        # teams of the previous season (summaries are sorted by position)
+        promoted_defaults = prev_summary.tail(3)[FEATURE_COLS].mean()
+        # align last season's stats with this season's teams; promoted
+        # teams come out as missing rows and get the bottom three stats
+        season_features = prev_summary[FEATURE_COLS].reindex(curr_summary.index)
+        season_features = season_features.fillna(promoted_defaults)
+        stop = start + len(curr_summary)
+        X[start:stop] = season_features.to_numpy()
+        y[start:stop] = curr_summary["position"].to_numpy()
+        start = stop
+
+    X_train = pd.DataFrame(X, columns=FEATURE_COLS)
+    y_train = pd.Series(y)
 
     # features for the most recent season for which we will predict the next season
-    last_summary = season_summaries[files_sorted[-1]].copy().set_index("team")
+    last_summary = season_summaries[files_sorted[-1]]
     # compute default features for new promoted teams in the upcoming season
     # this uses bottom three of last_summary
-    bottom_three_last = last_summary.sort_values(
-        ["points", "goal_diff", "goals_for"], ascending=[True, True, True]
-    ).head(3)
-    default_features_last = bottom_three_last.mean().to_dict()
+    default_features_last = last_summary.tail(3)[FEATURE_COLS].mean().to_dict()
     latest_features_rows = []
     latest_teams = last_summary.head(17).index.tolist()
     # incorporate promoted teams for 2025/26 (Leeds United, Burnley, Sunderland)
@@ -260,9 +386,7 @@ def prepare_training_data(season_files: List[str]) -> Tuple[pd.DataFrame, pd.Ser
 
     # if a promoted team already exists in last_summary (e.g. Burnley was relegated earlier), use its stats
     for team in latest_teams:
-        feats = last_summary.loc[team][
-            ["points", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff"]
-        ].to_dict()
+        feats = last_summary.loc[team][FEATURE_COLS].to_dict()
         latest_features_rows.append((team, feats))
 
     promotion_weights = {"Sunderland": 1.30, "Leeds United": 1.10, "Burnley": 1.00}
@@ -270,17 +394,24 @@ def prepare_training_data(season_files: List[str]) -> Tuple[pd.DataFrame, pd.Ser
         if team not in latest_teams:
             weight = promotion_weights.get(team, 1.00)
             good = {"points", "wins", "draws", "goals_for", "goal_diff"}
-            feats = {k: default_features_last[k] * (weight if k in good else 1/weight) for k in [
-            "points", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff"
-            ]}
+            feats = {k: default_features_last[k] * (weight if k in good else 1/weight)
+                     for k in FEATURE_COLS}
             latest_features_rows.append((team, feats))
     latest_features_df = pd.DataFrame([feats for _, feats in latest_features_rows],
-                                      index=[t for t, _ in latest_features_rows])
+                                      index=[t for t, _ in latest_features_rows]).astype(np.float32)
     return X_train, y_train, latest_features_df
 
 
-def build_and_train_model(X: pd.DataFrame, y: pd.Series) -> Pipeline:
-    """Create a pipeline that scales features and trains a RandomForest.
+def build_and_train_model(
+    X: pd.DataFrame, y: pd.Series, use_cache: bool = False
+) -> RandomForestClassifier:
+    """Train a RandomForest on the raw season features.
+
+    Trees split on thresholds, so the features are used unscaled.
+    When `use_cache` is set the fitted model is stored under
+    `CACHE_DIR` and reused by later calls with identical training
+    data, model hyperparameters and scikit‑learn version instead of
+    being retrained.
 
     Parameters
     ----------
@@ -288,31 +419,54 @@ def build_and_train_model(X: pd.DataFrame, y: pd.Series) -> Pipeline:
         Training features.
     y : Series
         Target positions (1–20).
+    use_cache : bool, default False
+        Whether to reuse or store the fitted model in `CACHE_DIR`.
 
     Returns
     -------
-    Pipeline
-        Scikit‑learn pipeline with StandardScaler and RandomForestClassifier.
+    RandomForestClassifier
+        Fitted scikit‑learn classifier.
     """
-    model = Pipeline([
-        ("scaler", StandardScaler()),
-        ("rf", RandomForestClassifier(
-            n_estimators=100,
-            max_depth=8,
-            random_state=42,
-            class_weight="balanced"
-        ))
-    ])
+    model = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=8,
+        random_state=42,
+        class_weight="balanced",
+        n_jobs=-1,
+    )
+    if not use_cache:
+        model.fit(X, y)
+        return model
+
+    # key on everything the fitted model depends on, so any change to
+    # the training data, hyperparameters or library retrains it
+    digest = hashlib.md5()
+    for array in (X.to_numpy(), y.to_numpy()):
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(repr(list(X.columns)).encode())
+    digest.update(repr(model).encode())
+    digest.update(sklearn.__version__.encode())
+    key = digest.hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"model_{key}.joblib")
+    if os.path.exists(cache_path):
+        try:
+            return joblib.load(cache_path)
+        except Exception:
+            # unreadable cache entry – retrain and overwrite it below
+            pass
+
     model.fit(X, y)
+    _write_atomically(cache_path, lambda tmp_path: joblib.dump(model, tmp_path, compress=3))
     return model
 
-def predict_league_table(model: Pipeline, features: pd.DataFrame) -> pd.DataFrame:
+def predict_league_table(model: RandomForestClassifier, features: pd.DataFrame) -> pd.DataFrame:
     """Predict the league table ordering for the given features.
 
     Parameters
     ----------
-    model : Pipeline
-        Trained scikit‑learn pipeline.
+    model : RandomForestClassifier
+        Trained scikit‑learn classifier.
     features : DataFrame
         Feature rows indexed by team name.
 
@@ -327,7 +481,7 @@ def predict_league_table(model: Pipeline, features: pd.DataFrame) -> pd.DataFram
     # multiplying each probability by its corresponding class index
     # (1–20) we obtain an expected (fractional) finishing position.
     probas = model.predict_proba(features)
-    classes = model.named_steps["rf"].classes_
+    classes = model.classes_
     exp_positions = probas.dot(classes)
     prediction_df = pd.DataFrame({
         "team": features.index,
@@ -356,7 +510,7 @@ def main():
     # prepare training data
     X_train, y_train, latest_features = prepare_training_data(season_files)
     # train model
-    model = build_and_train_model(X_train, y_train)
+    model = build_and_train_model(X_train, y_train, use_cache=True)
     # predict ranking for 2025/26
     predictions = predict_league_table(model, latest_features)
 